@@ -1,4 +1,39 @@
 import random
+from collections import namedtuple
+from enum import IntEnum
+from math import ceil, hypot
+from types import MappingProxyType
+
+import numpy as np
+
+
+class Product(IntEnum):
+    """Goods carried by the fleet; each value is the product's column in every quantity vector."""
+    ORANGE = 0
+    TUNA = 1
+    URANIUM = 2
+
+
+# Product names in column order, for rendering reports
+PRODUCTS = tuple(product.name.lower() for product in Product)
+# Plain int columns for the hot paths, where an enum attribute lookup costs more than the indexing itself
+ORANGE, TUNA, URANIUM = (int(product) for product in Product)
+# Generated demands stay within 0-200 kg and loads within the 2000 kg capacity, so 16 bits per quantity is plenty
+QUANTITY_DTYPE = np.int16
+# Largest demand a caller may pass in per product; anything above would wrap around in QUANTITY_DTYPE
+MAX_DEMAND = int(np.iinfo(QUANTITY_DTYPE).max)
+PRODUCT_BITS = 1 << np.arange(len(PRODUCTS))
+# Oranges and uranium must never be delivered by the same stop
+ILLEGAL_COMBO = (1 << ORANGE) | (1 << URANIUM)
+
+# A single entry of a vehicle route; remaining_demand is None for warehouse stops
+Stop = namedtuple(
+    "Stop", ["point", "delivery", "remaining_load", "remaining_demand", "is_warehouse", "distance_from_prev"]
+)
+
+# Shared by every stop that delivers nothing, so warehouse stops allocate no delivery vector
+NO_DELIVERY = np.zeros(len(PRODUCTS), dtype=QUANTITY_DTYPE)
+NO_DELIVERY.setflags(write=False)
 
 
 class Point:
@@ -8,49 +43,85 @@ class Point:
     Attributes:
     - x (int): x-coordinate of the point.
     - y (int): y-coordinate of the point.
-    - total_demand (int): total demand of the point.
-    - remaining_demand (int): remaining demand of the point.
+    - total_demand (np.ndarray): total demand of the point, one int16 per product.
+    - remaining_demand (np.ndarray): remaining demand of the point, one int16 per product.
     - label (str): label of the point
+    - idx (int): index of the point in the solver's point list, None until assigned.
     """
 
-    def __init__(self, x: int, y: int, demand: dict = None, label: str = None) -> None:
+    __slots__ = ("x", "y", "label", "total_demand", "remaining_demand", "idx")
+
+    def __init__(self, x: int, y: int, demand: np.ndarray = None, label: str = None) -> None:
         self.x = x
         self.y = y
         self.label = label
-        if demand:
-            self.total_demand = demand
+        self.idx = None
+        if demand is not None:
+            if isinstance(demand, dict):
+                raise ValueError(f"Invalid demand for {label}: expected one amount per product in {PRODUCTS} order, "
+                                 f"got a dict")
+            demand = np.asarray(demand)
+            if demand.shape != (len(PRODUCTS),):
+                raise ValueError(f"Invalid demand for {label}: expected shape ({len(PRODUCTS)},), "
+                                 f"got {demand.shape}")
+            if not np.issubdtype(demand.dtype, np.integer):
+                raise ValueError(f"Invalid demand for {label}: amounts must be whole kilograms, "
+                                 f"got {demand.tolist()}")
+            if demand.min() < 0 or demand.max() > MAX_DEMAND:
+                raise ValueError(f"Invalid demand for {label}: amounts must be between 0 and {MAX_DEMAND} kg, "
+                                 f"got {demand.tolist()}")
+            self.total_demand = demand.astype(QUANTITY_DTYPE)
         else:
             self.total_demand = self.generate_random_demand()
         self.remaining_demand = self.total_demand.copy()
 
     @staticmethod
-    def generate_random_demand() -> dict:
+    def generate_random_demand() -> np.ndarray:
         """Generates a random demand between 100 kg and 200 kg distributed across goods."""
         total = random.randint(100, 200)
         orange = random.randint(0, total)
         tuna = random.randint(0, total - orange)
         uranium = total - orange - tuna
-        return {"orange": orange, "tuna": tuna, "uranium": uranium}
+        return np.array([orange, tuna, uranium], dtype=QUANTITY_DTYPE)
 
-    def deliver(self, product: str, amount: int) -> int:
-        """Delivers a certain amount of goods to the point."""
-        self.remaining_demand[product] = max(0, self.remaining_demand[product] - amount)
-        return self.remaining_demand[product]
+    @staticmethod
+    def generate_random_demands(count: int, rng: np.random.Generator = None) -> np.ndarray:
+        """Generates random demands for `count` points at once, one row per point."""
+        rng = rng if rng is not None else np.random.default_rng()
+        totals = rng.integers(100, 201, size=count)
+        oranges = rng.integers(0, totals + 1)
+        tunas = rng.integers(0, totals - oranges + 1)
+        return np.column_stack([oranges, tunas, totals - oranges - tunas]).astype(QUANTITY_DTYPE)
+
+    def deliver(self, amounts: np.ndarray) -> np.ndarray:
+        """Delivers goods to the point and returns the remaining demand."""
+        np.subtract(self.remaining_demand, amounts, out=self.remaining_demand)
+        np.maximum(self.remaining_demand, 0, out=self.remaining_demand)
+        return self.remaining_demand
 
     def distance_to(self, other: "Point") -> float:
         """Calculates the Euclidean distance to another point."""
-        return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
+        return hypot(self.x - other.x, self.y - other.y)
 
 
 class Vehicle:
     """
     Class representing a vehicle.
     """
-    VEHICLE_TYPES = {
+    VEHICLE_TYPES = MappingProxyType({
         "green": 1000,
         "blue": 1500,
         "red": 2000,
-    }
+    })
+    _TYPES_TUPLE = tuple(VEHICLE_TYPES)
+    # Capacity per product, shared read-only by every vehicle
+    _CAPACITY = np.array([1000, 2000, 1500], dtype=QUANTITY_DTYPE)
+    _CAPACITY.setflags(write=False)
+
+    __slots__ = (
+        "id", "type", "route", "assigned_warehouse", "current_load", "capacity",
+        "driven_by_cat", "tuna_eaten_by_cat", "open_tuna", "total_distance", "load_total",
+    )
 
     def __init__(self, vehicle_id: int, vehicle_type: str) -> None:
         if vehicle_type not in self.VEHICLE_TYPES:
@@ -60,70 +131,97 @@ class Vehicle:
         self.type = vehicle_type
         self.route = []
         self.assigned_warehouse = None
-        self.current_load = {"orange": 0, "uranium": 0, "tuna": 0}
-        self.capacity = {product: cap for product, cap in zip(self.current_load, [1000, 1500, 2000])}
+        self.current_load = np.zeros(len(PRODUCTS), dtype=QUANTITY_DTYPE)
+        self.load_total = 0
+        self.capacity = Vehicle._CAPACITY
         self.driven_by_cat = False
-        self.tuna_eaten_by_cat = 0
+        self.tuna_eaten_by_cat = 0.0
+        # What is left of the kilogram of tuna the cat has started on; it no longer counts towards current_load
+        self.open_tuna = 0.0
+        self.total_distance = 0.0
 
     def reset(self) -> None:
         """Resets load and route of the vehicle."""
-        self.current_load = self.capacity
+        self.current_load[:] = self.capacity
+        self.load_total = int(self.capacity.sum())
+        self.open_tuna = 0.0
         self.route = []
+        self.total_distance = 0.0
 
-    def reload(self) -> dict:
+    def reload(self) -> np.ndarray:
         """Reloads the vehicle to full capacity."""
-        self.current_load = self.capacity.copy()
+        self.current_load[:] = self.capacity
+        self.load_total = int(self.capacity.sum())
+        self.open_tuna = 0.0
         return self.current_load
 
-    def add_stop(self, point: Point, delivery_amounts: dict = None, is_warehouse: bool = False) -> None:
-        delivery_amounts = delivery_amounts or {k: 0 for k in self.current_load}
+    def add_stop(self, point: Point, delivery_amounts: np.ndarray = None, is_warehouse: bool = False,
+                 distance: float = None, remaining_demand: np.ndarray = None) -> None:
+        """
+        Appends a stop to the route and delivers as much of `delivery_amounts` as the load allows.
+
+        Deliveries are taken from `remaining_demand` when given (e.g. a row of a solver-owned demand matrix),
+        otherwise from the point's own remaining demand.
+        """
+        if remaining_demand is None:
+            remaining_demand = point.remaining_demand
+        if delivery_amounts is None:
+            delivery_amounts = NO_DELIVERY
+        else:
+            # Kept in the caller's dtype so that amounts beyond the int16 range are capped below rather than wrapped
+            delivery_amounts = np.array(delivery_amounts)
 
         if not is_warehouse:
-            if not hasattr(point, "remaining_demand") or not isinstance(point.remaining_demand, dict):
-                print(f"[WARNING] Point {getattr(point, 'label', 'UNKNOWN')} has no proper demand structure.")
-                return
-            for product in self.current_load:
-                if product not in point.remaining_demand:
-                    print(f"[WARNING] Point {getattr(point, 'label', 'UNKNOWN')} missing demand for '{product}'")
-                    return
-
-            products = [product for product, amount in delivery_amounts.items() if amount > 0]
-            if "orange" in products and "uranium" in products:
+            products_mask = int(PRODUCT_BITS.dot(delivery_amounts > 0))
+            if products_mask & ILLEGAL_COMBO == ILLEGAL_COMBO:
                 print(
-                    f"[INFO] Vehicle {self.id} skipped illegal combo (orange + uranium) at {getattr(point, 'label', 'UNKNOWN')}")
+                    f"[INFO] Vehicle {self.id} skipped illegal combo (orange + uranium) at {point.label}")
                 return
 
-        stop_info = {
-            "point": point,
-            "delivery": delivery_amounts.copy(),
-            "remaining_load": self.current_load.copy(),
-            "remaining_demand": point.remaining_demand.copy() if not is_warehouse else None,
-            "is_warehouse": is_warehouse,
-        }
-        self.route.append(stop_info)
+        if distance is None:
+            distance = self.route[-1].point.distance_to(point) if self.route else 0.0
+        self.route.append(Stop(
+            point=point,
+            delivery=delivery_amounts,
+            remaining_load=self.current_load.copy(),
+            remaining_demand=remaining_demand.copy() if not is_warehouse else None,
+            is_warehouse=is_warehouse,
+            distance_from_prev=distance,
+        ))
+        self.total_distance += distance
 
         # If cat is driving and this isn't the first stop, have the cat eat tuna
+        # The cat eats exactly `distance` kg, but the load counts whole kilograms, so a kilogram leaves the load
+        # as soon as the cat starts on it and the rest of it is eaten before any further kilogram is touched
         if self.driven_by_cat and len(self.route) > 1:
-            prev_point = self.route[-2]["point"]
-            distance = prev_point.distance_to(point)
-            tuna_to_eat = min(self.current_load["tuna"], distance)
-            self.current_load["tuna"] -= tuna_to_eat
+            open_tuna = self.open_tuna
+            tuna_left = int(self.current_load[TUNA])
+            tuna_available = open_tuna + tuna_left
+            tuna_to_eat = distance if distance < tuna_available else tuna_available
+            if tuna_to_eat > open_tuna:
+                opened = ceil(tuna_to_eat - open_tuna)
+                opened = opened if opened < tuna_left else tuna_left
+            else:
+                opened = 0
+            self.open_tuna = open_tuna + opened - tuna_to_eat
             self.tuna_eaten_by_cat += tuna_to_eat
+            self.current_load[TUNA] -= opened
+            self.load_total -= opened
 
         if not is_warehouse:
-            for product, amount in delivery_amounts.items():
-                try:
-                    deliverable = min(amount, point.remaining_demand[product], self.current_load[product])
-                    self.current_load[product] -= deliverable
-                    point.deliver(product, deliverable)
-                except KeyError:
-                    print(
-                        f"[ERROR] Product '{product}' missing in either point or vehicle at {getattr(point, 'label', 'UNKNOWN')}")
+            deliverable = np.clip(delivery_amounts, 0, np.minimum(remaining_demand, self.current_load))
+            deliverable = deliverable.astype(QUANTITY_DTYPE)
+            self.current_load -= deliverable
+            self.load_total -= int(deliverable.sum())
+            remaining_demand -= deliverable
 
     @staticmethod
-    def create_random_vehicle(vehicle_id: int) -> "Vehicle":
-        """Creates a vehicle with a random type."""
-        vehicle_type = random.choice(list(Vehicle.VEHICLE_TYPES.keys()))
+    def create_random_vehicle(vehicle_id: int, rng: np.random.Generator = None) -> "Vehicle":
+        """Creates a vehicle with a random type, drawn from `rng` when given."""
+        if rng is not None:
+            vehicle_type = Vehicle._TYPES_TUPLE[rng.integers(len(Vehicle._TYPES_TUPLE))]
+        else:
+            vehicle_type = random.choice(Vehicle._TYPES_TUPLE)
         return Vehicle(vehicle_id, vehicle_type)
 
 
@@ -137,22 +235,32 @@ class Warehouse:
     - vehicles (list): List of vehicles stationed at this warehouse.
     """
 
+    __slots__ = ("id", "location", "vehicles")
+
     def __init__(self, warehouse_id: int, location: Point, vehicles: list = None) -> None:
         self.id = warehouse_id
         self.location = location
         self.vehicles = vehicles if vehicles is not None else []
 
-    def assign_initial_vehicle_positions(self, warehouses: list) -> None:
-        """Randomly assigns each vehicle to a warehouse."""
-        for vehicle in self.vehicles:
-            vehicle.assigned_warehouse = random.choice(warehouses)
+    def assign_initial_vehicle_positions(self, warehouses: list, rng: np.random.Generator = None) -> None:
+        """Randomly assigns each vehicle to a warehouse, drawing from `rng` when given."""
+        if rng is not None:
+            picks = [warehouses[i] for i in rng.integers(len(warehouses), size=len(self.vehicles))]
+        else:
+            picks = random.choices(warehouses, k=len(self.vehicles))
+        for vehicle, warehouse in zip(self.vehicles, picks):
+            vehicle.assigned_warehouse = warehouse
 
     def load_vehicle(self, vehicle: Vehicle) -> None:
         """Loads the vehicle to full capacity."""
         vehicle.reload()
 
-    def receive_goods(self, amount: int) -> None:
-        """Receives goods returned to the warehouse (unlimited storage)."""
+    def receive_goods(self, amount: np.ndarray) -> None:
+        """
+        Receives goods returned to the warehouse (unlimited storage).
+
+        Deprecated: storage is unlimited, so there is nothing to record; process_returned_goods no longer calls it.
+        """
         pass
 
     def dispatch_vehicle(self, vehicle: Vehicle) -> None:
@@ -162,10 +270,10 @@ class Warehouse:
         vehicle.add_stop(self.location, is_warehouse=True)
 
     def process_returned_goods(self, vehicle: Vehicle) -> None:
-        """Handles goods returned by a vehicle to the warehouse."""
-        returned_goods = vehicle.current_load
-        self.receive_goods(returned_goods)
-        vehicle.current_load = 0
+        """Handles goods returned by a vehicle to the warehouse by emptying the vehicle in place."""
+        vehicle.current_load.fill(0)
+        vehicle.load_total = 0
+        vehicle.open_tuna = 0.0
 
 
 class GingerCat:
@@ -173,21 +281,27 @@ class GingerCat:
     A fat, ginger cat that works at the company.
     Every day, the cat randomly chooses one vehicle to drive and eats tuna at a rate of 1kg/km.
     """
+
+    __slots__ = ("name", "selected_vehicle", "total_tuna_eaten")
+
     def __init__(self, name="Garfield"):
         self.name = name
         self.selected_vehicle = None
         self.total_tuna_eaten = 0
 
-    def select_random_vehicle(self, vehicles):
-        """Randomly selects a vehicle to drive for the day."""
+    def select_random_vehicle(self, vehicles, rng: np.random.Generator = None):
+        """Randomly selects a vehicle to drive for the day, drawing from `rng` when given."""
         # Reset previous vehicle if any
         if self.selected_vehicle:
             self.selected_vehicle.driven_by_cat = False
             self.total_tuna_eaten += self.selected_vehicle.tuna_eaten_by_cat
 
-        self.selected_vehicle = random.choice(vehicles)
+        if rng is not None:
+            self.selected_vehicle = vehicles[rng.integers(len(vehicles))]
+        else:
+            self.selected_vehicle = random.choice(vehicles)
         self.selected_vehicle.driven_by_cat = True
-        self.selected_vehicle.tuna_eaten_by_cat = 0
+        self.selected_vehicle.tuna_eaten_by_cat = 0.0
         return self.selected_vehicle
 
     def get_total_tuna_eaten(self):
@@ -201,20 +315,47 @@ class GingerCat:
         return f"{self.name}, the company's fat ginger cat"
 
 
-def generate_warehouses_and_vehicles(num_warehouses: int, num_vehicles_per_warehouse: int) -> list:
-    warehouses = []
-    for warehouse_id in range(num_warehouses):
-        x = random.randint(0, 100)
-        y = random.randint(0, 100)
-        warehouse_location = Point(x, y, label=f"Warehouse {warehouse_id + 1}")
+def distance_matrix(points: list) -> np.ndarray:
+    """Calculates the Euclidean distances between every pair of points."""
+    xs = np.fromiter((point.x for point in points), dtype=np.int32, count=len(points))
+    ys = np.fromiter((point.y for point in points), dtype=np.int32, count=len(points))
+    return np.hypot(xs[:, None] - xs[None, :], ys[:, None] - ys[None, :])
 
-        vehicles = [Vehicle.create_random_vehicle(vehicle_id=i) for i in range(num_vehicles_per_warehouse)]
+
+def generate_warehouses_and_vehicles(num_warehouses: int, num_vehicles_per_warehouse: int,
+                                     rng: np.random.Generator = None) -> list:
+    """
+    Generates warehouses with randomly typed vehicles.
+
+    Every random choice is drawn from `rng` when given, otherwise from the `random` module, so either
+    seeding `rng` or calling `random.seed` makes the result reproducible.
+    """
+    if rng is not None:
+        xs = rng.integers(0, 101, size=num_warehouses).tolist()
+        ys = rng.integers(0, 101, size=num_warehouses).tolist()
+        demands = Point.generate_random_demands(num_warehouses, rng)
+        locations = [Point(x, y, demand=demand, label=f"Warehouse {warehouse_id + 1}")
+                     for warehouse_id, (x, y, demand) in enumerate(zip(xs, ys, demands))]
+        type_indices = rng.integers(len(Vehicle._TYPES_TUPLE), size=(num_warehouses, num_vehicles_per_warehouse))
+        fleets = [[Vehicle._TYPES_TUPLE[i] for i in row] for row in type_indices.tolist()]
+    else:
+        locations = []
+        fleets = []
+        for warehouse_id in range(num_warehouses):
+            x = random.randint(0, 100)
+            y = random.randint(0, 100)
+            locations.append(Point(x, y, label=f"Warehouse {warehouse_id + 1}"))
+            fleets.append(random.choices(Vehicle._TYPES_TUPLE, k=num_vehicles_per_warehouse))
+
+    warehouses = []
+    for warehouse_id, (warehouse_location, vehicle_types) in enumerate(zip(locations, fleets)):
+        vehicles = [Vehicle(vehicle_id, vehicle_type) for vehicle_id, vehicle_type in enumerate(vehicle_types)]
 
         warehouse = Warehouse(warehouse_id, warehouse_location, vehicles)
         warehouses.append(warehouse)
 
     for warehouse in warehouses:
-        warehouse.assign_initial_vehicle_positions(warehouses)
+        warehouse.assign_initial_vehicle_positions(warehouses, rng=rng)
 
     return warehouses
 
@@ -4,8 +4,8 @@ import matplotlib.pyplot as plt
 def plot_routes(vehicles: list, points: list) -> None:
     """Visualizes vehicle routes on a map."""
     for i, vehicle in enumerate(vehicles):
-        x_coords = [stop["point"].x for stop in vehicle.route]
-        y_coords = [stop["point"].y for stop in vehicle.route]
+        x_coords = [stop.point.x for stop in vehicle.route]
+        y_coords = [stop.point.y for stop in vehicle.route]
         plt.plot(x_coords, y_coords, marker="o", label=f"Vehicle {i+1}")
 
     plt.scatter(
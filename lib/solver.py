@@ -1,14 +1,22 @@
-import random
-from lib.data_structures import Point, Vehicle
+import numpy as np
+
+from lib.data_structures import Point, Vehicle, distance_matrix
 
 class GeneticAlgorithmVRP:
-    def __init__(self, points: list, num_vehicles: int):
-        self.points = points
+    def __init__(self, points: list, num_vehicles: int, rng: np.random.Generator = None, dist: np.ndarray = None):
+        # Own copy, since route building shuffles it in place and callers may share one list between solvers
+        self.points = list(points)
+        for idx, point in enumerate(points):
+            point.idx = idx
+        # Pairwise distances indexed by point.idx; callers that already have them can pass them in
+        self.dist = dist if dist is not None else distance_matrix(points)
+        self.demand = np.stack([point.total_demand for point in points])
         self.num_vehicles = num_vehicles
         self.population_size = 100
         self.generations = 100
         self.mutation_rate = 0.1
         self.elite_size = 10
+        self.rng = rng if rng is not None else np.random.default_rng()
 
     def run(self):
         """Runs the genetic algorithm to generate the delivery routes."""
@@ -31,19 +39,18 @@ class GeneticAlgorithmVRP:
 
     def evolve_population(self, population):
         """Evolves the population using selection, crossover, and mutation."""
-        new_population = []
-        for _ in range(self.elite_size):
-            new_population.append(self.select_parent(population))
-        for _ in range(self.population_size - self.elite_size):
-            parent1 = self.select_parent(population)
-            parent2 = self.select_parent(population)
+        num_children = self.population_size - self.elite_size
+        new_population = self.select_parents(population, self.elite_size)
+        parents1 = self.select_parents(population, num_children)
+        parents2 = self.select_parents(population, num_children)
+        for parent1, parent2 in zip(parents1, parents2):
             child = self.crossover(parent1, parent2)
             new_population.append(self.mutate(child))
         return new_population
 
-    def select_parent(self, population):
-        """Selects a parent route based on fitness."""
-        return random.choice(population)
+    def select_parents(self, population, count):
+        """Selects `count` parent routes based on fitness, drawing all indices at once."""
+        return [population[i] for i in self.rng.integers(len(population), size=count)]
 
     def crossover(self, parent1, parent2):
         """Performs crossover between two parents to create a child route."""
@@ -58,34 +65,43 @@ class GeneticAlgorithmVRP:
         return population[0]
 
     def create_random_routes(self):
-        """Creates random routes for each vehicle."""
+        """Creates random routes for each vehicle, delivering against a fresh copy of the total demand."""
+        remaining_demand = self.demand.copy()
         routes = []
         for vehicle in range(self.num_vehicles):
-            route = self.create_random_route_for_vehicle(vehicle)
+            route = self.create_random_route_for_vehicle(vehicle, remaining_demand)
             routes.append(route)
         return routes
 
-    def create_random_route_for_vehicle(self, vehicle_id):
+    def create_random_route_for_vehicle(self, vehicle_id, remaining_demand):
         """Creates a random route for a given vehicle."""
-        random.shuffle(self.points)
-        vehicle = Vehicle.create_random_vehicle(vehicle_id)
-        vehicle.route = self.create_vehicle_route(vehicle)
+        self.rng.shuffle(self.points)
+        vehicle = Vehicle.create_random_vehicle(vehicle_id, rng=self.rng)
+        vehicle.route = self.create_vehicle_route(vehicle, remaining_demand)
         return vehicle
 
-    def create_vehicle_route(self, vehicle):
-        """Creates a route for a given vehicle."""
+    def create_vehicle_route(self, vehicle, remaining_demand):
+        """Creates a route for a given vehicle, taking deliveries off the rows of `remaining_demand`."""
         warehouse = self.points[0]  # Assume first point is warehouse
         vehicle.add_stop(warehouse, is_warehouse=True)
-        
-        for point in self.points[1:]:  # Skip the warehouse
-            if random.random() < 0.5:
-                delivery = {
-                    product: random.randint(0, min(point.remaining_demand[product], vehicle.current_load[product]))
-                    for product in point.remaining_demand
-                }
-                vehicle.add_stop(point, delivery_amounts=delivery, is_warehouse=False)
-        
+
+        visits = self.rng.random(len(self.points) - 1) < 0.5
+        for point, visit in zip(self.points[1:], visits):  # Skip the warehouse
+            if visit:
+                demand = remaining_demand[point.idx]
+                if vehicle.load_total:
+                    upper_bounds = np.minimum(demand, vehicle.current_load)
+                    delivery = self.rng.integers(0, upper_bounds, endpoint=True)
+                else:
+                    delivery = None  # An empty vehicle can only record the visit
+                vehicle.add_stop(point, delivery_amounts=delivery, is_warehouse=False,
+                                 distance=self.leg_distance(vehicle, point), remaining_demand=demand)
+
         # Return to warehouse
-        vehicle.add_stop(warehouse, is_warehouse=True)
-        
+        vehicle.add_stop(warehouse, is_warehouse=True, distance=self.leg_distance(vehicle, warehouse))
+
         return vehicle.route
+
+    def leg_distance(self, vehicle, point):
+        """Looks up the distance from the vehicle's last stop to the given point."""
+        return float(self.dist[vehicle.route[-1].point.idx, point.idx])
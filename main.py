@@ -1,61 +1,110 @@
-import random
-from lib.data_structures import Point, Vehicle, GingerCat
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from lib.data_structures import PRODUCTS, Point, Vehicle, GingerCat, distance_matrix
 from lib.solver import GeneticAlgorithmVRP
 from lib.io import save_routes
-from lib.plot import plot_routes
-from random import randint
 
-def generate_points(num_points: int, num_warehouses: int = 5) -> list:
+def generate_points(num_points: int, num_warehouses: int = 5, rng: np.random.Generator = None) -> list:
+    rng = rng if rng is not None else np.random.default_rng()
+    # The warehouses are always created, even when fewer points than warehouses are asked for
+    num_points = max(num_points, num_warehouses)
+    xs = rng.integers(0, 101, size=num_points).tolist()
+    ys = rng.integers(0, 101, size=num_points).tolist()
+    demands = Point.generate_random_demands(num_points, rng)
     points = []
 
     # Creating warehouses
     for i in range(num_warehouses):
-        x = random.randint(0, 100)
-        y = random.randint(0, 100)
-        points.append(Point(x, y, label=f"Warehouse {i+1}"))
+        points.append(Point(xs[i], ys[i], demand=demands[i], label=f"Warehouse {i+1}"))
 
     # Creating delivery points with random demand
-    for _ in range(num_points - num_warehouses):
-        x = random.randint(0, 100)
-        y = random.randint(0, 100)
-        label = f"Point ({x},{y})"
-        points.append(Point(x, y, label=label))
+    for i in range(num_warehouses, num_points):
+        label = f"Point ({xs[i]},{ys[i]})"
+        points.append(Point(xs[i], ys[i], demand=demands[i], label=label))
 
     return points
 
-def create_vehicles(num_vehicles: int) -> list:
-    return [Vehicle.create_random_vehicle(vehicle_id=i) for i in range(num_vehicles)]
+def create_vehicles(num_vehicles: int, rng: np.random.Generator = None) -> list:
+    return [Vehicle.create_random_vehicle(vehicle_id=i, rng=rng) for i in range(num_vehicles)]
+
+
+def run_island(rng: np.random.Generator, points: list, num_vehicles: int, dist: np.ndarray) -> list:
+    """Runs one independent GA population; kept at module level so worker processes can pickle it."""
+    ga = GeneticAlgorithmVRP(points, num_vehicles, rng=rng, dist=dist)
+    return ga.run()
+
 
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Plans delivery routes with a genetic algorithm.")
+    parser.add_argument("--seed", type=int, default=1, help="seed for every random choice (default: 1)")
+    parser.add_argument("--points", type=int, default=30, help="number of points, warehouses included (default: 30)")
+    parser.add_argument("--quiet", action="store_true", help="do not print the routes to stdout")
+    parser.add_argument("--no-plot", dest="plot", action="store_false", help="skip plotting (and importing matplotlib)")
+    return parser.parse_args(argv)
 
-def main():
-    random.seed(1)
 
-    num_points = 30
-    points = generate_points(num_points)
+def main(seed: int = 1, num_points: int = 30, quiet: bool = False, plot: bool = True):
+    # One generator drives every random choice, so a run is reproducible from this seed alone
+    rng = np.random.default_rng(seed)
+
+    points = generate_points(num_points, rng=rng)
 
     num_vehicles = 5
-    vehicles = create_vehicles(num_vehicles)
+    vehicles = create_vehicles(num_vehicles, rng=rng)
     
     company_cat = GingerCat("Mr. Whiskers")
-    company_cat.select_random_vehicle(vehicles)
-    print(f"🐱 {company_cat.name} has chosen vehicle {company_cat.selected_vehicle.id} for today's drive!")
+    company_cat.select_random_vehicle(vehicles, rng=rng)
+    if not quiet:
+        print(f"🐱 {company_cat.name} has chosen vehicle {company_cat.selected_vehicle.id} for today's drive!")
+
+    # Evolve independent islands in parallel and keep the plan with the shortest total distance
+    num_islands = 4
+    dist = distance_matrix(points)
+    island_args = (rng.spawn(num_islands), repeat(points), repeat(num_vehicles), repeat(dist))
+    max_workers = min(num_islands, os.cpu_count() or 1)
+    if max_workers == 1:
+        # A single worker would run the islands one after another anyway, so skip the process start-up and pickling
+        results = list(map(run_island, *island_args))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_island, *island_args))
+    routes = min(results, key=lambda island_routes: sum(vehicle.total_distance for vehicle in island_routes))
+
+    if not quiet:
+        report = ["Generated delivery routes for vehicles:"]
+        for i, vehicle in enumerate(routes, 1):
+            report.append(f"Vehicle {i} route:")
+            for stop in vehicle.route:
+                demand = dict(zip(PRODUCTS, stop.point.remaining_demand.tolist()))
+                report.append(f"  - {stop.point.label} (Demand: {demand})")
+
+            if vehicle.driven_by_cat:
+                report.append(
+                    f"  🐱 {company_cat.name} drove this vehicle and ate {vehicle.tuna_eaten_by_cat:.2f}kg of tuna!"
+                )
+        sys.stdout.write("\n".join(report) + "\n")
 
-    ga = GeneticAlgorithmVRP(points, num_vehicles)
-    routes = ga.run()
+    if not plot:
+        save_routes(routes, "output/routes.txt")
+        return
 
-    print("Generated delivery routes for vehicles:")
-    for i, vehicle in enumerate(routes, 1):
-        print(f"Vehicle {i} route:")
-        for stop in vehicle.route:
-            print(f"  - {stop['point'].label} (Demand: {stop['point'].remaining_demand})")
-        
-        if vehicle.driven_by_cat:
-            print(f"  🐱 {company_cat.name} drove this vehicle and ate {vehicle.tuna_eaten_by_cat:.2f}kg of tuna!")
+    # Imported here so runs without a plot never pay for loading matplotlib
+    from lib.plot import plot_routes
 
-    save_routes(routes, "output/routes.txt")
-    plot_routes(routes, points)
+    # Write the report in the background while matplotlib, which must stay on the main thread, renders the plot
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        saved = executor.submit(save_routes, routes, "output/routes.txt")
+        plot_routes(routes, points)
+        saved.result()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(seed=args.seed, num_points=args.points, quiet=args.quiet, plot=args.plot)
 